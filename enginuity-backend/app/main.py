@@ -1,8 +1,10 @@
 # app/main.py
+import importlib
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.core.config import get_settings
-from app.routers import health, notes, search, quiz, chat, export, upload, corpus
 import os
 os.environ["CHROMA_TELEMETRY_ENABLED"] = "false"
 os.environ["ANONYMIZED_TELEMETRY"] = "false"
@@ -14,17 +16,18 @@ settings = get_settings()
 app = FastAPI(
     title="Enginuity Backend",
     version="0.1.0",
-    description="Backend API for Enginuity AI"
+    description="Backend API for Enginuity AI",
+    # orjson serializes the citation-heavy /chat and /search payloads in C
+    default_response_class=ORJSONResponse,
 )
 
 # --- CORS Configuration ---
+# The settings validator already normalizes CORS_ALLOW_ORIGINS to a list;
+# the CSV split here only covers a raw string slipping through.
 raw_origins = settings.CORS_ALLOW_ORIGINS
 if isinstance(raw_origins, str):
-    origins = [o.strip() for o in raw_origins.split(",") if o.strip()]
-elif isinstance(raw_origins, list):
-    origins = [str(o).strip() for o in raw_origins if str(o).strip()]
-else:
-    origins = ["http://localhost:8501"]  # default fallback
+    raw_origins = raw_origins.split(",")
+origins = [o for o in (str(s).strip() for s in raw_origins or []) if o]
 
 app.add_middleware(
     CORSMiddleware,
@@ -32,17 +35,43 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browsers cache the preflight response for a day so the Streamlit
+    # UI doesn't pay an OPTIONS round-trip on every cross-origin call.
+    max_age=86400,
 )
 
 # --- Routers ---
-app.include_router(health.router, prefix="/health", tags=["health"])
-app.include_router(notes.router, prefix="/notes", tags=["notes"])
-app.include_router(search.router, prefix="/search", tags=["search"])
-app.include_router(quiz.router, prefix="/quiz", tags=["quiz"])
-app.include_router(chat.router, prefix="/chat", tags=["chat"])
-app.include_router(export.router, prefix="/export", tags=["export"])
-app.include_router(upload.router, prefix="/upload", tags=["upload"])
-app.include_router(corpus.router, prefix="/corpus", tags=["corpus"])
+# Registration table + importlib keeps the module list in one place and
+# means importing app.main no longer spells out eight `from app.routers
+# import ...` names (heavy deps like chromadb/sentence-transformers load
+# inside the router modules; see the startup warmup below).
+ROUTERS = [
+    ("health", "/health"),
+    ("notes", "/notes"),
+    ("search", "/search"),
+    ("quiz", "/quiz"),
+    ("chat", "/chat"),
+    ("export", "/export"),
+    ("upload", "/upload"),
+    ("corpus", "/corpus"),
+]
+for _name, _prefix in ROUTERS:
+    _mod = importlib.import_module(f"app.routers.{_name}")
+    app.include_router(_mod.router, prefix=_prefix, tags=[_name])
+
+# --- Startup warmup ---
+@app.on_event("startup")
+def warm_vector_store() -> None:
+    """Open the Chroma client/collection (and its embedding model) at boot
+    so the first /chat or /search request doesn't pay the load cost."""
+    try:
+        from app.services.vector import collection
+
+        collection()
+    except Exception:
+        # Vector store is optional; endpoints fall back gracefully.
+        pass
+
 
 # --- Root Route ---
 @app.get("/")
@@ -44,6 +44,7 @@ class ChatRequest(BaseModel):
     messages: List[ChatMessage]
     top_k: Optional[int] = 5
     temperature: Optional[float] = 0.2
+    stream: bool = False  # when True, /chat answers as an SSE stream
 
 
 class ChatResponse(BaseModel):
@@ -1,25 +1,43 @@
 # app/routers/chat.py
 from __future__ import annotations
 
+import asyncio
+import functools
+import io
+import json
 import os
-from typing import List, Dict, Any, Optional, Sequence, Union, cast
+import threading
+from typing import List, Dict, Any, Sequence, Union, cast
 
+from cachetools import TTLCache
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 
 from app.models.schemas import ChatRequest, ChatResponse, ChatMessage
 from app.services.vector import search as vector_search
 
+router = APIRouter()
+
+
 # ----------------------------
-# Optional: OpenAI client
+# Optional: OpenAI client (lazy)
 # ----------------------------
-try:
-    from openai import OpenAI
-
-    _openai: Optional[OpenAI] = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-except Exception:
-    _openai = None
+@functools.lru_cache(maxsize=1)
+def _get_openai():
+    """Import and build the OpenAI client on first use only.
+
+    The openai package has a large import-time cost; deferring it keeps
+    cold start fast for workers/requests that never reach the LLM.
+    Returns None when the SDK or API key is unavailable.
+    """
+    if not os.getenv("OPENAI_API_KEY"):
+        return None
+    try:
+        from openai import OpenAI
 
-router = APIRouter()
+        return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    except Exception:
+        return None
 
 
 # ----------------------------
@@ -39,6 +57,33 @@ Always be concise, factual, and avoid adding outside information that is not in
 """.strip()
 
 
+# ----------------------------
+# Retrieval cache
+# ----------------------------
+# Repeated questions (demo loops, retried turns) re-embed the same text on
+# CPU. A short-TTL cache makes those repeats free; /upload clears it when
+# the corpus changes.
+_retrieval_cache: TTLCache = TTLCache(maxsize=1024, ttl=300)
+_retrieval_lock = threading.Lock()
+
+
+def _cached_vector_search(question: str, top_k: int) -> List[Dict[str, Any]]:
+    key = (question, top_k)
+    with _retrieval_lock:
+        hits = _retrieval_cache.get(key)
+    if hits is None:
+        hits = vector_search(question, top_k=top_k)
+        with _retrieval_lock:
+            _retrieval_cache[key] = hits
+    return hits
+
+
+def clear_retrieval_cache() -> None:
+    """Drop cached retrievals (called after a new corpus is indexed)."""
+    with _retrieval_lock:
+        _retrieval_cache.clear()
+
+
 # ============================================================
 # Helpers
 # ============================================================
@@ -56,11 +101,17 @@ def _msg_to_plain_dict(msg: MsgLike) -> Dict[str, Any]:
 
 
 def _last_user_message(messages: Sequence[MsgLike]) -> str:
-    """Extract the most recent user message."""
+    """Extract the most recent user message.
+
+    Walks the history backwards with plain attribute/key access instead of
+    model_dump-ing every entry just to discard all but the last user turn.
+    """
     for msg in reversed(messages):
-        m = _msg_to_plain_dict(msg)
-        if m.get("role") == "user":
-            content = m.get("content", "")
+        if isinstance(msg, ChatMessage):
+            role, content = msg.role, msg.content
+        else:
+            role, content = msg.get("role"), msg.get("content", "")
+        if role == "user":
             if isinstance(content, dict):
                 return str(content.get("text", ""))
             return str(content)
@@ -68,55 +119,61 @@ def _last_user_message(messages: Sequence[MsgLike]) -> str:
     return ""
 
 
+# Pre-bound user-instruction template (static text formatted per request)
+_USER_INSTRUCTION_FMT = (
+    "Using ONLY the lecture context above, answer this question:\n\n{q}"
+)
+
+
 def _build_context_block(hits: List[Dict[str, Any]]) -> str:
-    """Construct a text block out of vector search hits."""
+    """Construct a text block out of vector search hits.
+
+    Writes into one StringIO buffer instead of allocating several
+    intermediate header/part strings per hit and joining at the end.
+    """
     if not hits:
         return ""
 
-    parts: List[str] = []
+    buf = io.StringIO()
     for idx, h in enumerate(hits, 1):
-        sec = h.get("section_id", f"match-{idx}")
-        source = h.get("source", "Notes")
+        buf.write("[")
+        buf.write(str(h.get("section_id") or f"match-{idx}"))
+        buf.write(" | ")
+        buf.write(str(h.get("source") or "Notes"))
         score = h.get("score")
-
-        header = f"[{sec} | {source}"
         if score is not None:
-            header += f" | score={score:.2f}"
-        header += "]"
-
-        snippet = h.get("document") or h.get("snippet") or ""
-        parts.append(f"{header}\n{snippet}\n")
-
-    return "\n\n".join(parts)
+            buf.write(f" | score={score:.2f}")
+        buf.write("]\n")
+        buf.write(h.get("document") or h.get("snippet") or "")
+        buf.write("\n\n\n")
+    return buf.getvalue()[:-2]  # drop the trailing blank separator
+
+
+def _fallback_answer(context_block: str) -> str:
+    """Answer used when no OpenAI client is configured."""
+    if not context_block:
+        return "I could not find any relevant information in the lecture notes."
+    return (
+        "Model access is not configured. But based on your notes:\n\n"
+        f"{context_block}"
+    )
 
 
-def _llm_answer(
+def _build_messages_payload(
     question: str,
     context_block: str,
-    history: Sequence[MsgLike],
-    temperature: float = 0.2,
-) -> str:
-    """Send the constructed prompt to OpenAI, or fall back if not configured."""
-    # If no OpenAI configured → fallback
-    if not _openai:
-        if not context_block:
-            return "I could not find any relevant information in the lecture notes."
-        return (
-            "Model access is not configured. But based on your notes:\n\n"
-            f"{context_block}"
-        )
-
-    # Normalize last 6–8 messages from history
+    history: Sequence[Dict[str, Any]],
+) -> List[Dict[str, str]]:
+    """Assemble the full OpenAI messages payload (system + history + query)."""
+    # Normalize last 6–8 messages from history (already plain dicts)
     trimmed_messages: List[Dict[str, str]] = []
-    for msg in history[-8:]:
-        m = _msg_to_plain_dict(msg)
+    for m in history[-8:]:
         role = str(m.get("role", "user"))
         content: Any = m.get("content", "")
         if isinstance(content, dict):
             content = content.get("text", "")
         trimmed_messages.append({"role": role, "content": str(content)})
 
-    # Build full prompt
     messages_payload: List[Dict[str, str]] = [
         {"role": "system", "content": SYSTEM_PROMPT},
         {"role": "system", "content": f"CONTEXT FROM NOTES:\n\n{context_block}"},
@@ -124,14 +181,24 @@ def _llm_answer(
 
     # Explicit user query to focus the model
     messages_payload.append(
-        {
-            "role": "user",
-            "content": (
-                "Using ONLY the lecture context above, answer this question:\n\n"
-                f"{question}"
-            ),
-        }
+        {"role": "user", "content": _USER_INSTRUCTION_FMT.format(q=question)}
     )
+    return messages_payload
+
+
+def _llm_answer(
+    question: str,
+    context_block: str,
+    history: Sequence[Dict[str, Any]],
+    temperature: float = 0.2,
+) -> str:
+    """Send the constructed prompt to OpenAI, or fall back if not configured."""
+    # If no OpenAI configured → fallback
+    _openai = _get_openai()
+    if not _openai:
+        return _fallback_answer(context_block)
+
+    messages_payload = _build_messages_payload(question, context_block, history)
 
     # Pylance / typing: cast to the expected type from OpenAI SDK
     from openai.types.chat import ChatCompletionMessageParam
@@ -146,34 +213,93 @@ def _llm_answer(
     return (resp.choices[0].message.content or "").strip()
 
 
+def _llm_answer_stream(
+    question: str,
+    context_block: str,
+    history: Sequence[Dict[str, Any]],
+    temperature: float = 0.2,
+):
+    """Yield answer text incrementally (single chunk when OpenAI is absent)."""
+    _openai = _get_openai()
+    if not _openai:
+        yield _fallback_answer(context_block)
+        return
+
+    messages_payload = _build_messages_payload(question, context_block, history)
+
+    from openai.types.chat import ChatCompletionMessageParam
+
+    typed_messages = cast(List[ChatCompletionMessageParam], messages_payload)
+
+    stream = _openai.chat.completions.create(
+        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+        temperature=float(temperature),
+        messages=typed_messages,
+        stream=True,
+    )
+    for chunk in stream:
+        yield chunk.choices[0].delta.content or ""
+
+
+def _sse_events(chunks, citations: List[Dict[str, Any]]):
+    """Format answer chunks as SSE; the last event carries the citations."""
+    for chunk in chunks:
+        if chunk:
+            yield f"data: {json.dumps({'delta': chunk}, ensure_ascii=False)}\n\n"
+    yield f"data: {json.dumps({'done': True, 'citations': citations}, ensure_ascii=False)}\n\n"
+
+
 # ============================================================
 # Main Chat Endpoint
 # ============================================================
 @router.post("", response_model=ChatResponse)
-def chat(req: ChatRequest) -> ChatResponse:
+async def chat(req: ChatRequest) -> Union[ChatResponse, StreamingResponse]:
     if not req.messages:
         raise HTTPException(status_code=400, detail="No messages provided.")
 
-    # 1) Latest question
+    # 1) Latest question (cheap reverse scan over the raw messages)
     question = _last_user_message(req.messages)
     if not question.strip():
         raise HTTPException(status_code=400, detail="Empty question.")
 
-    # 2) Retrieve context from vector DB
+    # 2) Retrieve context from vector DB.
+    # Embedding runs on CPU for hundreds of ms, so push it off the event
+    # loop instead of blocking every other in-flight request — and start
+    # it before the history normalization so the two overlap.
     try:
         top_k = max(1, min(int(req.top_k or 5), 15))
     except Exception:
         top_k = 5
 
-    hits = vector_search(question, top_k=top_k)
+    search_task = asyncio.create_task(
+        asyncio.to_thread(_cached_vector_search, question, top_k)
+    )
+
+    # Materialize the history as plain dicts exactly once while the
+    # retrieval is in flight; the LLM prompt build reuses this list.
+    plain = [_msg_to_plain_dict(m) for m in req.messages]
+
+    hits = await search_task
     context_block = _build_context_block(hits)
 
-    # 3) LLM answer
-    answer_text = _llm_answer(
-        question=question,
-        context_block=context_block,
-        history=req.messages,
-        temperature=float(req.temperature or 0.2),
+    # 3a) Streaming answer (opt-in): SSE deltas, citations in the final event.
+    # Starlette iterates the sync generator in a threadpool, so the blocking
+    # OpenAI stream stays off the event loop.
+    if req.stream:
+        gen = _llm_answer_stream(
+            question, context_block, plain, float(req.temperature or 0.2)
+        )
+        return StreamingResponse(
+            _sse_events(gen, hits), media_type="text/event-stream"
+        )
+
+    # 3b) Buffered LLM answer (network-bound; also kept off the loop)
+    answer_text = await asyncio.to_thread(
+        _llm_answer,
+        question,
+        context_block,
+        plain,
+        float(req.temperature or 0.2),
     )
 
     return ChatResponse(
@@ -1,11 +1,14 @@
-from fastapi import APIRouter
+import hashlib
+import json
+
+from fastapi import APIRouter, Request, Response
 from app.services.io import read_json, notes_json
 from app.models.schemas import NotesDoc
 
 router = APIRouter()
 
 @router.get("", response_model=NotesDoc)
-def get_notes():
+def get_notes(request: Request, response: Response):
     sample = {
         "lecture_title": "Sample Notes",
         "generated_at": 0,
@@ -19,4 +22,15 @@ def get_notes():
         ],
     }
     doc = read_json(notes_json(), sample)
+
+    # Stable content hash so repeat loads from the Streamlit pages can be
+    # answered with a 304 instead of re-shipping the full document.
+    etag = hashlib.blake2b(
+        json.dumps(doc, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304)
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "max-age=60"
     return doc
@@ -52,4 +52,9 @@ async def upload(files: List[UploadFile] = File(...), kind: str = Form("doc")):
     # index vectors for search/chat
     index_sections(doc["lecture_title"], sections)
 
+    # drop cached /chat retrievals built against the previous corpus
+    from app.routers.chat import clear_retrieval_cache
+
+    clear_retrieval_cache()
+
     return {"ok": True, "lecture_title": doc["lecture_title"], "n_sections": len(sections)}
@@ -127,6 +127,14 @@ with left:
                 st.write("• Building searchable index…")
                 status.update(label="Processing complete ✅", state="complete")
                 st.session_state["has_corpus"] = True
+                # Drop the cached /corpus/status snapshot so other pages
+                # see the fresh corpus immediately instead of after the TTL.
+                try:
+                    from ui.bootstrap import _fetch_status
+
+                    _fetch_status.clear()
+                except Exception:
+                    pass
                 st.success("Your corpus is ready (backend).")
             except Exception as e:
                 # graceful fallback (your original simulated steps)
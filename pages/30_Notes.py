@@ -70,14 +70,25 @@ def load_notes() -> Dict[str, Any]:
     Tries the backend first (GET /notes) if httpx is available.
     Falls back to local notes.json if present, otherwise returns a small in-memory sample.
     """
-    # 1) Backend – only if httpx & FASTAPI_URL available
+    # 1) Backend – only if httpx & FASTAPI_URL available.
+    # Sends If-None-Match so unchanged notes come back as a cheap 304 and
+    # we reuse the copy cached in session state instead of re-parsing JSON.
     if httpx is not None and FASTAPI_URL:
         try:
             with st.spinner("Loading notes from backend…"):
-                r = httpx.get(f"{FASTAPI_URL}/notes", timeout=15.0)
+                headers = {}
+                etag = st.session_state.get("notes_etag")
+                if etag and st.session_state.get("notes_doc"):
+                    headers["If-None-Match"] = etag
+                r = httpx.get(f"{FASTAPI_URL}/notes", timeout=15.0, headers=headers)
+                if r.status_code == 304:
+                    return st.session_state["notes_doc"]
                 r.raise_for_status()
                 doc = r.json()
                 if isinstance(doc, dict) and doc.get("sections"):
+                    if r.headers.get("ETag"):
+                        st.session_state["notes_etag"] = r.headers["ETag"]
+                        st.session_state["notes_doc"] = doc
                     return doc
         except Exception:
             # If backend fails, fall through to local/sample
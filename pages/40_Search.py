@@ -5,7 +5,10 @@ from pathlib import Path
 import re
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict
 
 # --- Path setup ---
@@ -13,14 +16,9 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-# Try to import httpx, but don't crash if it's missing
-try:
-    import httpx  # type: ignore
-except ImportError:
-    httpx = None  # type: ignore
-
 import streamlit as st
 from ui.bootstrap import ensure_corpus
+from ui.http import get_client
 from ui.theme import load_css
 
 # --- Page setup ---
@@ -51,17 +49,32 @@ st.title("Search Notes")
 # --- Metadata ---
 DATA_DIR = Path("data")
 NOTES_JSON = DATA_DIR / "notes.json"
+
+
+# Cached notes.json parse, keyed on mtime so a re-processed lecture refreshes it
+@st.cache_data(show_spinner=False)
+def _load_notes(mtime: float) -> dict:
+    return json.loads(NOTES_JSON.read_text(encoding="utf-8"))
+
+
+# Caption string memoized on its inputs: strftime + formatting run once
+# per lecture, not on every rerun.
+@st.cache_data(show_spinner=False)
+def _caption(title: str, ts: int) -> str:
+    return (
+        f"Lecture: **{title}** · Generated: "
+        f"{datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M')}"
+    )
+
+
 lecture_title = "Notes"
 if NOTES_JSON.exists():
     try:
-        notes_doc = json.loads(NOTES_JSON.read_text(encoding="utf-8"))
+        notes_doc = _load_notes(NOTES_JSON.stat().st_mtime)
         lecture_title = notes_doc.get("lecture_title", lecture_title)
         ts = notes_doc.get("generated_at")
         if ts:
-            st.caption(
-                f"Lecture: **{lecture_title}** · Generated: "
-                f"{datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M')}"
-            )
+            st.caption(_caption(lecture_title, int(ts)))
     except Exception:
         st.caption(f"Lecture: **{lecture_title}**")
 
@@ -82,6 +95,41 @@ mode_map: Dict[str, str] = {
 }
 FASTAPI_URL = os.getenv("FASTAPI_URL", "http://127.0.0.1:8000")
 
+
+# Worker pool for background searches; owning it via cache_resource keeps
+# one pool per process across reruns.
+@st.cache_resource(show_spinner=False)
+def _pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=4)
+
+
+def _do_search(payload: Dict[str, object]) -> list:
+    # Shared pooled client; searches keep their shorter per-call timeout.
+    resp = get_client().post("/search", json=payload, timeout=30.0)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def _demo_hits() -> list:
+    """Graceful fallback when the backend is unreachable."""
+    return [
+        {
+            "title": "Laplace Transform — definition",
+            "snippet": "The Laplace transform of f(t) is defined as 𝓛{f(t)} = ∫₀^∞ f(t)e^{-st} dt.",
+            "score": 0.82,
+            "section_id": "sec-2",
+            "source": lecture_title,
+        },
+        {
+            "title": "Poles & stability",
+            "snippet": "A linear system is stable if all poles lie strictly in the left half-plane.",
+            "score": 0.77,
+            "section_id": "sec-1",
+            "source": lecture_title,
+        },
+    ]
+
+
 # --- Run search ---
 if submitted:
     q_clean = q.strip()
@@ -89,56 +137,74 @@ if submitted:
         st.warning("Please enter a query.")
     else:
         sel_mode: str = mode_map.get(mode, "hybrid")
-
+        if FASTAPI_URL:
+            # Fire the request on a worker thread and keep rendering; the
+            # polling block below shows skeleton cards until it lands.
+            st.session_state["search_fut"] = _pool().submit(
+                _do_search, {"q": q_clean, "top_k": int(top_k), "mode": sel_mode}
+            )
+            st.session_state.pop("search_hits", None)
+        else:
+            st.error("Search backend not configured, showing demo results.")
+            st.session_state["search_hits"] = _demo_hits()
+
+# --- Poll an in-flight search ---
+fut = st.session_state.get("search_fut")
+if fut is not None:
+    if fut.done():
+        del st.session_state["search_fut"]
         try:
-            if httpx is not None and FASTAPI_URL:
-                with st.spinner("Searching…"):
-                    resp = httpx.post(
-                        f"{FASTAPI_URL}/search",
-                        json={"q": q_clean, "top_k": int(top_k), "mode": sel_mode},
-                        timeout=30.0,
-                    )
-                    resp.raise_for_status()
-                    st.session_state["search_hits"] = resp.json()
-            else:
-                # Force fallback if httpx is missing or FASTAPI_URL empty
-                raise RuntimeError("Backend search not available (httpx or FASTAPI_URL missing)")
+            st.session_state["search_hits"] = fut.result()
         except Exception as e:
             st.error(f"Search failed or backend unavailable, showing demo results. ({e})")
-            # graceful fallback
-            st.session_state["search_hits"] = [
-                {
-                    "title": "Laplace Transform — definition",
-                    "snippet": "The Laplace transform of f(t) is defined as 𝓛{f(t)} = ∫₀^∞ f(t)e^{-st} dt.",
-                    "score": 0.82,
-                    "section_id": "sec-2",
-                    "source": lecture_title,
-                },
-                {
-                    "title": "Poles & stability",
-                    "snippet": "A linear system is stable if all poles lie strictly in the left half-plane.",
-                    "score": 0.77,
-                    "section_id": "sec-1",
-                    "source": lecture_title,
-                },
-            ]
+            st.session_state["search_hits"] = _demo_hits()
+    elif st.button("Cancel search"):
+        fut.cancel()
+        del st.session_state["search_fut"]
+    else:
+        st.markdown(
+            "".join('<div class="result-card skeleton"></div>' for _ in range(int(top_k))),
+            unsafe_allow_html=True,
+        )
+        time.sleep(0.2)
+        st.rerun()
 
 # --- Render results ---
 hits = st.session_state.get("search_hits", [])
 
 
+@lru_cache(maxsize=64)
+def _hl_pattern(query: str):
+    """Compile (and memoize) a multi-term highlight regex for a query.
+
+    One alternation of all query tokens, longest first so longer terms
+    aren't masked by their prefixes; individual tokens get highlighted
+    even when semantic ranking surfaced the hit.
+    """
+    terms = sorted({t for t in query.split() if len(t) >= 2}, key=len, reverse=True)
+    if not terms:
+        return None
+    return re.compile("|".join(re.escape(t) for t in terms), re.IGNORECASE)
+
+
 def highlight(text: str, query: str) -> str:
     if not query or not text:
         return text or ""
     try:
-        pattern = re.compile(re.escape(query), re.IGNORECASE)
-        return pattern.sub(lambda m: f"<mark>{m.group(0)}</mark>", text)
+        # \g<0> backref lets the regex engine format the replacement in C
+        # instead of calling back into a Python lambda per match.
+        pat = _hl_pattern(query.strip())
+        return pat.sub(r"<mark>\g<0></mark>", text) if pat else text
     except re.error:
         return text
 
 
 if hits:
     st.subheader("Results")
+
+    # One markdown component for the whole results list: N cards collapse
+    # into a single frontend delta instead of ~3 widget messages per hit.
+    parts: list[str] = []
     for i, h in enumerate(hits, 1):
         title = h.get("title", "Untitled")
         snippet = h.get("snippet", "")
@@ -146,7 +212,7 @@ if hits:
         section_id = h.get("section_id")
         source = h.get("source", lecture_title)
 
-        st.markdown(
+        parts.append(
             f"""
             <div class="result-card">
               <div style="display:flex;justify-content:space-between;align-items:center;">
@@ -158,15 +224,23 @@ if hits:
               </div>
               {"<p>"+ highlight(snippet, q) +"</p>" if show_snippets and snippet else ""}
             </div>
-            """,
-            unsafe_allow_html=True,
+            """
+        )
+    st.markdown("".join(parts), unsafe_allow_html=True)
+
+    # Actions collapsed into one expander with a result picker, so the page
+    # no longer materializes two button widgets for every hit on each rerun.
+    with st.expander("Result actions"):
+        pick = st.selectbox(
+            "Result",
+            options=list(range(1, len(hits) + 1)),
+            format_func=lambda i: f"{i}. {hits[i - 1].get('title', 'Untitled')}",
         )
-
         a1, a2, a3 = st.columns([1, 1, 6])
         with a1:
-            st.button("Open in Notes", key=f"open-{i}")
+            st.button("Open in Notes", key="open-result")
         with a2:
-            st.button("Copy citation", key=f"cite-{i}")
+            st.button("Copy citation", key="cite-result")
 else:
     st.info("Type a query and press **Search** to see results.")
     st.caption(
@@ -2,10 +2,11 @@
 
 import sys
 from pathlib import Path
+import io
 import json
 import random
 import os
-import uuid
+import sqlite3
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
@@ -18,11 +19,29 @@ import streamlit as st
 from ui.theme import load_css
 from ui.bootstrap import ensure_corpus
 
-# Try to import httpx, but don't crash if missing
+# httpx and uuid are imported lazily where needed: httpx pulls a heavy
+# dependency tree (h11, certifi, idna) that most reruns never touch.
+
+# Prefer orjson for history payloads (C encode/decode, bytes out — no
+# extra str->utf-8 pass on write); fall back to stdlib json
 try:
-    import httpx  # type: ignore
+    import orjson  # type: ignore
+
+    _loads = orjson.loads
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def _dumps_pretty(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
 except ImportError:
-    httpx = None  # type: ignore
+    _loads = json.loads
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    def _dumps_pretty(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
 
 # IMPORTANT: set_page_config should be called only once in the main entry page.
 # st.set_page_config(page_title="Quiz", page_icon="🧩", layout="wide")
@@ -57,46 +76,149 @@ NOTES_JSON = DATA_DIR / "notes.json"
 SNAPSHOTS_FILE = DATA_DIR / "quiz_snapshots.jsonl"
 ATTEMPTS_FILE = DATA_DIR / "quiz_attempts.jsonl"
 
+# Cached notes.json parse: reruns hit the in-process copy, and the
+# (mtime_ns, size) cache key invalidates when a new lecture is processed.
+@st.cache_data(show_spinner=False)
+def _load_notes(mtime_ns: int, size: int) -> dict:
+    return _loads(NOTES_JSON.read_bytes())
+
+def _notes_doc() -> dict:
+    stat = NOTES_JSON.stat()
+    return _load_notes(stat.st_mtime_ns, stat.st_size)
+
+# Caption string memoized on its inputs: strftime + formatting run once
+# per lecture, not on every rerun.
+@st.cache_data(show_spinner=False)
+def _caption(title: str, ts: int) -> str:
+    return (
+        f"Lecture: **{title}** · Generated: "
+        f"{datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M')}"
+    )
+
 lecture_title = st.session_state.get("lecture_title", "Notes")
 generated_at = st.session_state.get("generated_at")
 
 if generated_at:
     try:
-        ts = int(generated_at)
-        st.caption(
-            f"Lecture: **{lecture_title}** · Generated: "
-            f"{datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M')}"
-        )
+        st.caption(_caption(lecture_title, int(generated_at)))
     except Exception:
         pass
 elif NOTES_JSON.exists():
     # Fallback: read from notes.json
     try:
-        doc = json.loads(NOTES_JSON.read_text(encoding="utf-8"))
+        doc = _notes_doc()
         lecture_title = doc.get("lecture_title", lecture_title)
         ts = doc.get("generated_at")
         if ts:
-            st.caption(
-                f"Lecture: **{lecture_title}** · Generated: "
-                f"{datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M')}"
-            )
+            st.caption(_caption(lecture_title, int(ts)))
     except Exception:
         pass
 
-# ---------- Local history helpers (JSONL) ----------
+# ---------- Local history helpers (SQLite) ----------
+QUIZ_DB = DATA_DIR / "quiz.db"
+
 def _now_iso() -> str:
     return datetime.now().isoformat()
 
-def _append_jsonl(path: Path, obj: dict) -> None:
-    try:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        with path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(obj, ensure_ascii=False) + "\n")
-    except Exception as e:
-        st.warning(f"Could not write to {path.name}: {e}")
+def _archive_legacy(path: Path) -> None:
+    """Gzip an imported JSONL file (JSON text compresses ~5x) and drop the original."""
+    import gzip
+    import shutil
+
+    with path.open("rb") as src, gzip.open(
+        path.with_suffix(".jsonl.migrated.gz"), "wb", compresslevel=6
+    ) as dst:
+        shutil.copyfileobj(src, dst)
+    path.unlink()
+
+def _migrate_jsonl(conn: "sqlite3.Connection") -> None:
+    """One-time import of the legacy JSONL history into SQLite."""
+    if SNAPSHOTS_FILE.exists():
+        # Bytes in, orjson decode: skips the per-line unicode pass and the
+        # pure-Python parser for what can be a multi-MB one-time import.
+        with SNAPSHOTS_FILE.open("rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    obj = _loads(line)
+                    conn.execute(
+                        "INSERT OR IGNORE INTO snapshots (snapshot_id, created_at, payload) VALUES (?, ?, ?)",
+                        (obj.get("snapshot_id"), obj.get("created_at"), _dumps(obj)),
+                    )
+                except Exception:
+                    continue
+        _archive_legacy(SNAPSHOTS_FILE)
+    if ATTEMPTS_FILE.exists():
+        with ATTEMPTS_FILE.open("rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    obj = _loads(line)
+                    conn.execute(
+                        "INSERT OR IGNORE INTO attempts "
+                        "(attempt_id, snapshot_id, lecture, submitted_at, saved_at, payload) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (
+                            obj.get("attempt_id"),
+                            obj.get("snapshot_id"),
+                            obj.get("lecture"),
+                            obj.get("submitted_at"),
+                            obj.get("saved_at"),
+                            _dumps(obj),
+                        ),
+                    )
+                except Exception:
+                    continue
+        _archive_legacy(ATTEMPTS_FILE)
+
+# Cached once per process: each save/load reuses the open handle instead
+# of paying connect + PRAGMA + schema DDL + migration check per call.
+# Streamlit reruns scripts on pooled threads, hence check_same_thread=False
+# (WAL mode makes cross-thread use of one writer connection safe here).
+@st.cache_resource(show_spinner=False)
+def _conn() -> "sqlite3.Connection":
+    """Open data/quiz.db, creating the schema (and migrating JSONL) as needed.
+
+    Indexed columns turn the old full-file JSONL scans into point/range
+    queries: load_snapshot is a primary-key lookup and load_attempts is an
+    index-ordered LIMIT query.
+    """
+    QUIZ_DB.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(
+        str(QUIZ_DB), isolation_level=None, check_same_thread=False
+    )
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS snapshots ("
+        "snapshot_id TEXT PRIMARY KEY, created_at TEXT, payload TEXT NOT NULL)"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS attempts ("
+        "attempt_id TEXT PRIMARY KEY, snapshot_id TEXT, lecture TEXT, "
+        "submitted_at TEXT, saved_at TEXT, payload TEXT NOT NULL)"
+    )
+    # Expression indexes matching the COALESCE sort key exactly, so both
+    # load_attempts queries walk an index in order instead of collecting
+    # matches and sorting them in a temp b-tree.
+    conn.execute("DROP INDEX IF EXISTS idx_att_lec_sub")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_att_lec_ts "
+        "ON attempts(lecture, COALESCE(submitted_at, saved_at, '') DESC)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_att_ts "
+        "ON attempts(COALESCE(submitted_at, saved_at, '') DESC)"
+    )
+    _migrate_jsonl(conn)
+    return conn
 
 def save_quiz_snapshot(meta: dict, items: list) -> str:
     """Persist exactly what the user sees after Generate."""
+    import uuid
+
     snapshot_id = str(uuid.uuid4())
     rec = {
         "snapshot_id": snapshot_id,
@@ -104,7 +226,13 @@ def save_quiz_snapshot(meta: dict, items: list) -> str:
         "meta": meta,
         "items": items,
     }
-    _append_jsonl(SNAPSHOTS_FILE, rec)
+    try:
+        _conn().execute(
+            "INSERT INTO snapshots (snapshot_id, created_at, payload) VALUES (?, ?, ?)",
+            (snapshot_id, rec["created_at"], _dumps(rec)),
+        )
+    except Exception as e:
+        st.warning(f"Could not write snapshot: {e}")
     return snapshot_id
 
 def save_quiz_attempt(
@@ -115,6 +243,8 @@ def save_quiz_attempt(
     submitted_at: str,
 ) -> str:
     """Persist a graded attempt with per-question review."""
+    import uuid
+
     attempt_id = str(uuid.uuid4())
     score_raw = sum(1 for r in review if r.get("ok"))
     score_max = max(1, len(review))
@@ -131,73 +261,147 @@ def save_quiz_attempt(
         "score_raw": score_raw,
         "score_max": score_max,
         "score_pct": round(100.0 * score_raw / score_max, 2),
-        "items": review,
+        # Slim per-question rows: question text, gold answer and
+        # explanation are all derivable from the snapshot at read time,
+        # so only the user's input and the verdict are persisted.
+        "items": [
+            {"i": r["i"], "pred": r["your"], "ok": r["ok"]} for r in review
+        ],
     }
-    _append_jsonl(ATTEMPTS_FILE, rec)
+    try:
+        _conn().execute(
+            "INSERT INTO attempts "
+            "(attempt_id, snapshot_id, lecture, submitted_at, saved_at, payload) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                attempt_id,
+                snapshot_id,
+                rec["lecture"],
+                submitted_at,
+                rec["saved_at"],
+                _dumps(rec),
+            ),
+        )
+        load_attempts.clear()
+    except Exception as e:
+        st.warning(f"Could not write attempt: {e}")
     return attempt_id
 
+# Cached so the Past-attempts section doesn't re-query on every widget
+# interaction; save_quiz_attempt clears it when a new attempt lands.
+@st.cache_data(show_spinner=False)
 def load_attempts(lecture: Optional[str] = None, limit: int = 20) -> list[dict]:
     """Read latest attempts (optionally filtered by lecture)."""
-    if not ATTEMPTS_FILE.exists():
-        return []
-    rows: list[dict] = []
     try:
-        with ATTEMPTS_FILE.open("r", encoding="utf-8") as f:
-            for line in f:
-                try:
-                    obj = json.loads(line)
-                    if (lecture is None) or (obj.get("lecture") == lecture):
-                        rows.append(obj)
-                except Exception:
-                    pass
-        rows.sort(key=lambda r: r.get("submitted_at") or r.get("saved_at") or "", reverse=True)
-        return rows[:limit]
+        if lecture is None:
+            cur = _conn().execute(
+                "SELECT payload FROM attempts "
+                "ORDER BY COALESCE(submitted_at, saved_at, '') DESC LIMIT ?",
+                (limit,),
+            )
+        else:
+            cur = _conn().execute(
+                "SELECT payload FROM attempts WHERE lecture = ? "
+                "ORDER BY COALESCE(submitted_at, saved_at, '') DESC LIMIT ?",
+                (lecture, limit),
+            )
+        return [_loads(row[0]) for row in cur.fetchall()]
     except Exception:
         return []
 
+# Snapshots are immutable once written, so the decoded payload can be
+# memoized per id — re-opening a past-attempt expander skips even the
+# point query.
+@st.cache_data(show_spinner=False)
 def load_snapshot(snapshot_id: str) -> Optional[dict]:
-    """Find a snapshot by id from quiz_snapshots.jsonl."""
-    if not snapshot_id or not SNAPSHOTS_FILE.exists():
+    """Find a snapshot by id (primary-key lookup)."""
+    if not snapshot_id:
         return None
     try:
-        with SNAPSHOTS_FILE.open("r", encoding="utf-8") as f:
-            for line in f:
-                try:
-                    obj = json.loads(line)
-                    if obj.get("snapshot_id") == snapshot_id:
-                        return obj
-                except Exception:
-                    continue
+        row = _conn().execute(
+            "SELECT payload FROM snapshots WHERE snapshot_id = ?", (snapshot_id,)
+        ).fetchone()
+        return _loads(row[0]) if row else None
     except Exception:
-        pass
-    return None
+        return None
 
 # ---------- Helpers ----------
+# One shared generator instance: bound-method calls skip the module-global
+# indirection inside the random module's convenience functions.
+_rng = random.Random()
+
 def reset_attempt_state() -> None:
     st.session_state["quiz_answers"] = {}      # question_idx -> user answer
     st.session_state["quiz_submitted"] = False
     st.session_state["quiz_score"] = None
 
-def shuffle_choices(choices: List[str], answer: str):
-    """Return (shuffled_choices, correct_index) while preserving the correct answer string."""
-    if not choices:
-        return [], None
-    items = list(choices)
-    random.shuffle(items)
-    correct_index = items.index(answer) if answer in items else None
-    return items, correct_index
+def shuffle_all_choices(items: List[Dict[str, Any]]) -> None:
+    """Refresh choices_shuf for every item in place.
+
+    Items with the standard 4-choice shape are permuted together with one
+    NumPy argsort over an (n, 4) matrix instead of n Python-level
+    shuffles; odd shapes take a single sample() call. Grading compares
+    answer strings, so no per-shuffle correct-index search is needed.
+    """
+    import numpy as np  # deferred: only Generate/Retake need it
+
+    four: List[Dict[str, Any]] = []
+    for it in items:
+        choices = it.get("choices", [])
+        if len(choices) == 4:
+            four.append(it)
+        elif choices:
+            it["choices_shuf"] = _rng.sample(choices, k=len(choices))
+        else:
+            it["choices_shuf"] = []
+
+    if four:
+        arr = np.array([it["choices"] for it in four], dtype=object)
+        perms = np.argsort(np.random.rand(len(four), 4), axis=1)
+        shuffled = np.take_along_axis(arr, perms, axis=1)
+        for it, row in zip(four, shuffled):
+            it["choices_shuf"] = list(row)
 
 def load_local_sections() -> List[Dict[str, Any]]:
     """Read sections from notes.json (used to scope quiz generation)."""
     if NOTES_JSON.exists():
         try:
-            _doc = json.loads(NOTES_JSON.read_text(encoding="utf-8"))
-            secs = _doc.get("sections", [])
+            secs = _notes_doc().get("sections", [])
             return [s for s in secs if s.get("content")]
         except Exception:
             return []
     return []
 
+# Context assembly memoized per (scope, notes version): repeated Generate
+# clicks with an unchanged section scope reuse the built string instead of
+# re-walking every section.
+@st.cache_data(show_spinner=False)
+def _scoped_context(section_ids: tuple, mtime_ns: int, size: int) -> str:
+    by_id = {s.get("id", ""): s for s in load_local_sections()}
+    buf = io.StringIO()
+    remaining = 12000
+    for sid in section_ids:
+        s = by_id.get(sid)
+        if s is None:
+            continue
+        title = s.get("title", "")
+        content = s.get("content", "")
+        s_type = s.get("type", "text")
+        if s_type == "code":
+            chunk = f"{title}\nCode:\n{content}\n"
+        elif s_type == "latex":
+            chunk = f"{title}\nMath:\n{content}\n"
+        else:
+            chunk = f"{title}\n{content}\n"
+        if buf.tell():
+            chunk = "\n\n" + chunk
+        if len(chunk) >= remaining:
+            buf.write(chunk[:remaining])
+            break
+        buf.write(chunk)
+        remaining -= len(chunk)
+    return buf.getvalue().strip()
+
 def local_quiz_from_sections(
     n: int,
     qtype: str,
@@ -241,21 +445,23 @@ def local_quiz_from_sections(
     pool: List[str] = []
     for s in sections:
         txt = str(s.get("content") or "")
-        for line in txt.split("\n"):
-            line = line.strip()
-            if len(line) > 40:
-                pool.append(line)
+        # map/genexpr keep the strip+filter loop in C; the upper bound
+        # drops boilerplate blobs that would bloat the pool unused
+        pool.extend(l for l in map(str.strip, txt.splitlines()) if 40 < len(l) < 500)
 
-    random.shuffle(pool)
-    for line in pool[: n * 2]:  # oversample a bit
+    # Draw only the oversample we need instead of shuffling the whole pool.
+    for line in _rng.sample(pool, k=min(n * 2, len(pool))):
         if len(items) >= n:
             break
         if qtype.lower() in ("fib", "fill-in-the-blank"):
-            # Pick a word from the line
-            words = [w for w in re.split(r"\s+", line) if len(w) > 3]
+            # Cheap rejection before tokenizing: a usable line needs a few
+            # candidate words. str.split handles whitespace runs in C.
+            if line.count(" ") < 4:
+                continue
+            words = [w for w in line.split() if len(w) > 3]
             if not words:
                 continue
-            answer = random.choice(words)
+            answer = _rng.choice(words)
             q = line.replace(answer, "____", 1)
             items.append(
                 {
@@ -286,8 +492,13 @@ def local_quiz_from_sections(
     return items[:n]
 
 # ---------- Section scope (optional) ----------
+# Titles derived once per notes.json version instead of per rerun.
+@st.cache_data(show_spinner=False)
+def _section_titles(mtime: float) -> List[str]:
+    return [s.get("title", "Untitled") for s in load_local_sections()]
+
 all_sections = load_local_sections()
-section_titles = [s.get("title", "Untitled") for s in all_sections]
+section_titles = _section_titles(NOTES_JSON.stat().st_mtime) if NOTES_JSON.exists() else []
 
 with st.expander("Section scope (optional)"):
     picked_titles = st.multiselect(
@@ -312,23 +523,13 @@ FASTAPI_URL = (os.getenv("FASTAPI_URL", "http://127.0.0.1:8000") or "").rstrip("
 if generated:
     # Build scoped context from selected sections (or all sections if none picked)
     section_ids: List[str] = [s.get("id", "") for s in picked] if picked else []
-    raw_context_parts: List[str] = []
-    for s in (picked or all_sections):
-        title = s.get("title", "")
-        content = s.get("content", "")
-        s_type = s.get("type", "text")
-        if not content:
-            continue
-        if s_type == "code":
-            raw_context_parts.append(f"{title}\nCode:\n{content}\n")
-        elif s_type == "latex":
-            raw_context_parts.append(f"{title}\nMath:\n{content}\n")
-        else:
-            raw_context_parts.append(f"{title}\n{content}\n")
 
-    context_text = "\n\n".join(raw_context_parts).strip()
-    if len(context_text) > 12000:
-        context_text = context_text[:12000]
+    if NOTES_JSON.exists():
+        stat = NOTES_JSON.stat()
+        scope = tuple(s.get("id", "") for s in (picked or all_sections))
+        context_text = _scoped_context(scope, stat.st_mtime_ns, stat.st_size)
+    else:
+        context_text = ""
 
     if not context_text.strip() and not (topic_seed and topic_seed.strip()):
         st.error("No study material found. Select sections or provide a topic focus.")
@@ -352,10 +553,12 @@ if generated:
         payload["type"] = "fib"
 
     used_backend = False
-    if httpx is not None and FASTAPI_URL:
+    if FASTAPI_URL:
         try:
+            from ui.http import get_client  # deferred until a backend call fires
+
             with st.spinner("Generating quiz from backend…"):
-                r = httpx.post(f"{FASTAPI_URL}/quiz", json=payload, timeout=60.0)
+                r = get_client().post("/quiz", json=payload, timeout=60.0)
                 r.raise_for_status()
                 items_from_api = r.json() or []
                 used_backend = True
@@ -373,14 +576,18 @@ if generated:
         )
 
     # Prepare view-model with shuffled choices
-    vm: List[Dict[str, Any]] = []
-    for it in items_from_api:
-        choices = it.get("choices", [])
-        if choices:
-            shuf, _ = shuffle_choices(choices, it.get("answer", ""))
-            vm.append({**it, "choices_shuf": shuf})
-        else:
-            vm.append({**it, "choices_shuf": []})
+    vm: List[Dict[str, Any]] = [
+        {
+            **it,
+            "choices_shuf": [],
+            # Precomputed once here so grading (and re-grading on
+            # Retake) compares without re-normalizing the gold string.
+            "_is_mcq": bool(it.get("choices")),
+            "_gold_norm": str(it.get("answer", "")).strip().lower(),
+        }
+        for it in items_from_api
+    ]
+    shuffle_all_choices(vm)
 
     st.session_state["quiz_items"] = vm
     st.session_state["quiz_meta"] = {
@@ -403,89 +610,115 @@ if generated:
 
     reset_attempt_state()
 
+# Download payload serialized once per quiz: keyed on the generation and
+# attempt-start timestamps (the latter changes on Retake, which reshuffles
+# choices), so reruns from radio clicks stop re-encoding the full payload.
+@st.cache_data(show_spinner=False)
+def _quiz_bytes(generated_key: str, started_key: str) -> bytes:
+    return _dumps_pretty(
+        {
+            "meta": st.session_state.get("quiz_meta", {}),
+            "items": st.session_state.get("quiz_items", []),
+        }
+    )
+
 # ---------- Render Quiz ----------
 items = st.session_state.get("quiz_items", [])
 meta = st.session_state.get("quiz_meta", {})
 
-if not items:
-    st.info("Set your preferences above and click **Generate Quiz**.")
-else:
-    st.subheader(
-        f"{meta.get('lecture','Notes')} · "
-        f"{meta.get('type','MCQ')} · "
-        f"{meta.get('difficulty','Auto')}"
-    )
-    focus = f" · Focus: {meta['topic']}" if meta.get("topic") else ""
-    st.caption(f"{meta.get('n', len(items))} questions{focus}")
-    if meta.get("section_ids"):
-        st.caption(f"Scoped to {len(meta['section_ids'])} section(s)")
+# The whole interactive quiz body runs as a fragment: Download/Retake
+# clicks re-enter only this subtree, skipping the top-of-page work
+# (status check, notes parse, caption build) on every interaction.
+@st.fragment
+def _render_quiz(items: List[Dict[str, Any]], meta: Dict[str, Any]) -> None:
+    # One form around the whole question list: intermediate keystrokes and
+    # radio clicks no longer rerun the script (and rebuild every widget) —
+    # state syncs once, on Submit All.
+    with st.form("quiz_answers_form"):
+        for i, item in enumerate(items, 1):
+            st.markdown("<div class='quiz-card'>", unsafe_allow_html=True)
+            st.write(f"**{i}.** {item.get('q', '')}")
+
+            if item.get("choices_shuf"):
+                st.radio(
+                    "Choose:",
+                    options=item["choices_shuf"],
+                    key=f"ans-{i}",
+                    horizontal=True,
+                    index=None,
+                )
+            else:
+                st.text_input("Your answer", key=f"ans-{i}")
 
-    if "quiz_started_at" not in st.session_state:
-        st.session_state["quiz_started_at"] = datetime.now().isoformat()
+            st.markdown("</div>", unsafe_allow_html=True)
 
-    for i, item in enumerate(items, 1):
-        st.markdown("<div class='quiz-card'>", unsafe_allow_html=True)
-        st.write(f"**{i}.** {item.get('q', '')}")
-
-        if item.get("choices_shuf"):
-            user = st.radio(
-                "Choose:",
-                options=item["choices_shuf"],
-                key=f"ans-{i}",
-                horizontal=True,
-                index=None,
-            )
-            st.session_state.setdefault("quiz_answers", {})
-            st.session_state["quiz_answers"][i] = user or ""
-        else:
-            user = st.text_input("Your answer", key=f"ans-{i}")
-            st.session_state.setdefault("quiz_answers", {})
-            st.session_state["quiz_answers"][i] = (user or "").strip()
+        submit = st.form_submit_button("Submit All ✅")
 
-        st.markdown("</div>", unsafe_allow_html=True)
+    if submit:
+        # Collect answers from the form's widget state in one pass
+        # (free-text answers stripped, MCQ picks kept verbatim).
+        answers: Dict[int, str] = {}
+        for i, it in enumerate(items, 1):
+            val = st.session_state.get(f"ans-{i}") or ""
+            answers[i] = val if it.get("choices_shuf") else val.strip()
+        st.session_state["quiz_answers"] = answers
 
-    c1, c2, c3 = st.columns([1, 1, 2])
-    with c1:
-        submit = st.button("Submit All ✅")
+    c2, c3 = st.columns([1, 3])
     with c2:
-        dl_payload = {"meta": meta, "items": items}
         st.download_button(
             "Download .json",
-            data=json.dumps(dl_payload, indent=2),
+            data=_quiz_bytes(
+                meta.get("generated_at", ""),
+                st.session_state.get("quiz_started_at", ""),
+            ),
             file_name="quiz.json",
+            mime="application/json",
         )
     with c3:
         if st.button("Retake / Regenerate 🔁"):
-            for it in items:
-                if it.get("choices"):
-                    shuf, _ = shuffle_choices(it["choices"], it["answer"])
-                    it["choices_shuf"] = shuf
+            shuffle_all_choices(items)
             reset_attempt_state()
             st.session_state["quiz_started_at"] = datetime.now().isoformat()
 
     if submit and not st.session_state.get("quiz_submitted"):
+        import numpy as np
+
         answers = st.session_state.get("quiz_answers", {})
-        correct = 0
-        review = []
-        for i, it in enumerate(items, 1):
-            gold = str(it.get("answer", ""))
-            pred = str(answers.get(i, "") or "")
-            is_mcq = bool(it.get("choices"))
-            if is_mcq:
-                ok = (pred == gold)
-            else:
-                ok = pred.strip().lower() == gold.strip().lower()
-            correct += int(ok)
-            review.append(
-                {
-                    "i": i,
-                    "q": it.get("q", ""),
-                    "your": pred or "—",
-                    "answer": gold,
-                    "ok": ok,
-                    "explanation": it.get("explanation", ""),
-                }
+        gold = np.array([str(it.get("answer", "")) for it in items])
+        pred = np.array(
+            [str(answers.get(i, "") or "") for i in range(1, len(items) + 1)]
+        )
+        mcq_mask = np.array(
+            [bool(it.get("_is_mcq", it.get("choices"))) for it in items], dtype=bool
+        )
+        gold_norm = np.array(
+            [
+                it.get("_gold_norm") or str(it.get("answer", "")).strip().lower()
+                for it in items
+            ]
+        )
+        # Element-wise kernels instead of a Python branch per question;
+        # FIB answers are normalized with np.char in C.
+        ok_arr = np.where(
+            mcq_mask,
+            pred == gold,
+            np.char.lower(np.char.strip(pred)) == gold_norm,
+        )
+        correct = int(ok_arr.sum())
+
+        review = [
+            {
+                "i": i,
+                "q": it.get("q", ""),
+                "your": p or "—",
+                "answer": g,
+                "ok": ok,
+                "explanation": it.get("explanation", ""),
+            }
+            for i, (it, p, g, ok) in enumerate(
+                zip(items, pred.tolist(), gold.tolist(), ok_arr.tolist()), 1
             )
+        ]
 
         st.session_state["quiz_submitted"] = True
         st.session_state["quiz_score"] = {
@@ -504,12 +737,18 @@ else:
             submitted_at=submitted_at_iso,
         )
         st.session_state["quiz_attempt_id"] = attempt_id
-        st.caption(f"Attempt saved · id: `{attempt_id[:8]}…`")
+        # Full-app rerun so the Past-attempts section (outside this
+        # fragment) picks up the new attempt immediately.
+        st.rerun(scope="app")
 
     if st.session_state.get("quiz_submitted"):
         sc = st.session_state["quiz_score"]
         pct = 100.0 * sc["correct"] / max(1, sc["total"])
         st.success(f"Score: **{sc['correct']} / {sc['total']}**  ({pct:.0f}%)")
+        if st.session_state.get("quiz_attempt_id"):
+            st.caption(
+                f"Attempt saved · id: `{st.session_state['quiz_attempt_id'][:8]}…`"
+            )
 
         with st.expander("Review answers"):
             for r in sc["review"]:
@@ -521,6 +760,24 @@ else:
                 if r.get("explanation"):
                     st.info(r["explanation"])
 
+if not items:
+    st.info("Set your preferences above and click **Generate Quiz**.")
+else:
+    st.subheader(
+        f"{meta.get('lecture','Notes')} · "
+        f"{meta.get('type','MCQ')} · "
+        f"{meta.get('difficulty','Auto')}"
+    )
+    focus = f" · Focus: {meta['topic']}" if meta.get("topic") else ""
+    st.caption(f"{meta.get('n', len(items))} questions{focus}")
+    if meta.get("section_ids"):
+        st.caption(f"Scoped to {len(meta['section_ids'])} section(s)")
+
+    if "quiz_started_at" not in st.session_state:
+        st.session_state["quiz_started_at"] = datetime.now().isoformat()
+
+    _render_quiz(items, meta)
+
 # ---------- Past attempts ----------
 st.markdown("### Past attempts")
 past = load_attempts(lecture=lecture_title)
@@ -543,11 +800,20 @@ else:
 
             for r in a.get("items", []):
                 idx = int(r.get("i", 0))
-                q_text = r.get("q", "")
-                your = r.get("your", "—")
-                gold = r.get("answer", "")
+                try:
+                    snap_item = snap_items[idx - 1] if idx - 1 >= 0 else None
+                except Exception:
+                    snap_item = None
+                snap_item = snap_item or {}
+
+                # Slim records carry only pred/ok; question text, gold
+                # answer and explanation come from the snapshot. Older
+                # full-shape records still read their embedded copies.
+                q_text = r.get("q") or snap_item.get("q", "")
+                your = r.get("your") or r.get("pred", "—")
+                gold = r.get("answer") or str(snap_item.get("answer", ""))
                 ok = bool(r.get("ok"))
-                expl = r.get("explanation")
+                expl = r.get("explanation") or snap_item.get("explanation")
 
                 st.markdown("---")
                 st.markdown(f"**Q{idx}.** {q_text}")
@@ -557,11 +823,7 @@ else:
                 if expl:
                     st.caption(f"Explanation: {expl}")
 
-                try:
-                    snap_item = snap_items[idx - 1] if idx - 1 >= 0 else None
-                except Exception:
-                    snap_item = None
-                if snap_item and snap_item.get("choices_shuf"):
+                if snap_item.get("choices_shuf"):
                     st.caption("Choices from original quiz:")
                     st.write(" · ".join(f"`{c}`" for c in snap_item["choices_shuf"]))
 
@@ -3,6 +3,7 @@
 import sys
 import json
 import os
+from collections import deque
 from pathlib import Path
 from datetime import datetime
 
@@ -12,12 +13,22 @@ if str(ROOT) not in sys.path:
 
 import streamlit as st
 from ui.theme import load_css
+from ui.http import get_client
 
-# Try to import httpx; fall back gracefully if not available
+# Prefer orjson for the export payload (C encoder, bytes out); fall back
+# to stdlib json when it's missing
 try:
-    import httpx  # type: ignore
+    import orjson  # type: ignore
+
+    _loads = orjson.loads
+
+    def _dumps_pretty(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
 except ImportError:
-    httpx = None  # we'll handle this later
+    _loads = json.loads
+
+    def _dumps_pretty(obj) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
 
 # IMPORTANT: set_page_config should be called only once in the main entry page (Home.py)
 # st.set_page_config(page_title="AI Assistant", page_icon="🤖", layout="wide")
@@ -37,10 +48,15 @@ st.markdown('<div class="chat-page">', unsafe_allow_html=True)
 st.title("AI Assistant")
 
 # ---------- Runtime state ----------
-st.session_state.setdefault(
-    "messages",
-    [{"role": "assistant", "content": "Ask me about your lecture."}]
-)
+# History lives in a bounded deque: appends self-trim at 60 turns, so the
+# render loop and export never walk an unbounded list on long sessions.
+_MAX_TURNS = 60
+_GREETING = {"role": "assistant", "content": "Ask me about your lecture."}
+
+messages = st.session_state.get("messages")
+if not isinstance(messages, deque):
+    messages = deque(messages or [_GREETING], maxlen=_MAX_TURNS)
+    st.session_state["messages"] = messages
 st.session_state.setdefault("chat_meta", {})
 
 # ---------- Controls (context + generation) ----------
@@ -54,9 +70,8 @@ show_citations = c4.toggle("Show citations", value=True)
 a1, a2 = st.columns([1, 1])
 with a1:
     if st.button("Clear chat 🗑️"):
-        st.session_state["messages"] = [
-            {"role": "assistant", "content": "Ask me about your lecture."}
-        ]
+        messages = deque([_GREETING], maxlen=_MAX_TURNS)
+        st.session_state["messages"] = messages
 with a2:
     export_payload = {
         "meta": {
@@ -65,17 +80,35 @@ with a2:
             "top_k": top_k,
             "temperature": temperature,
         },
-        "messages": st.session_state["messages"],
+        "messages": list(messages),
     }
     st.download_button(
         "Export .json",
-        data=json.dumps(export_payload, indent=2),
+        data=_dumps_pretty(export_payload),
         file_name="chat_export.json",
+        mime="application/json",
     )
 
 st.divider()
 
 # ---------- Renderer with optional citations ----------
+def _render_citations(cites):
+    with st.expander("Sources"):
+        for i, c in enumerate(cites, 1):
+            title = c.get("title", f"Source {i}")
+            sec = c.get("section_id")
+            score = c.get("score")
+            snip = c.get("snippet", "")
+            line = title
+            if sec:
+                line += f" · Section: {sec}"
+            if score is not None:
+                line += f" · Score: {float(score):.2f}"
+            st.markdown(f"- **{line}**")
+            if snip:
+                st.caption(snip)
+
+
 def render_message(msg):
     role = msg.get("role", "assistant")
     content = msg.get("content", "")
@@ -89,70 +122,91 @@ def render_message(msg):
             st.markdown(content)
 
         if show_citations and role == "assistant" and cites:
-            with st.expander("Sources"):
-                for i, c in enumerate(cites, 1):
-                    title = c.get("title", f"Source {i}")
-                    sec = c.get("section_id")
-                    score = c.get("score")
-                    snip = c.get("snippet", "")
-                    line = title
-                    if sec:
-                        line += f" · Section: {sec}"
-                    if score is not None:
-                        line += f" · Score: {float(score):.2f}"
-                    st.markdown(f"- **{line}**")
-                    if snip:
-                        st.caption(snip)
-
-# Render chat so far
-for m in st.session_state["messages"]:
-    render_message(m)
+            _render_citations(cites)
 
 FASTAPI_URL = (os.getenv("FASTAPI_URL", "http://127.0.0.1:8000") or "").rstrip("/")
 
-# ---------- Input ----------
-prompt = st.chat_input("Type your question…")
-
-if prompt:
-    # Append user turn
-    st.session_state["messages"].append({"role": "user", "content": prompt})
-    with st.chat_message("user"):
-        st.markdown(prompt)
-
-    # ---- Build payload for backend ----
-    payload = {
-        "messages": st.session_state["messages"],
-        "top_k": int(top_k),
-        "temperature": float(temperature),
-        "ctx_mode": "notes" if ctx_mode == "Notes only" else "notes+web",
-    }
 
-    # ---- Call backend if httpx is available ----
-    if httpx is None:
-        # Fallback: simple local response if the dependency is missing
-        answer_msg = {
-            "role": "assistant",
-            "content": {
-                "text": (
-                    "The chat backend isn't available because the `httpx` "
-                    "library is not installed in this environment.\n\n"
-                    "You can still ask conceptual questions, but I can't "
-                    "retrieve your indexed notes or web results here."
-                )
-            },
-            "citations": [],
+# History render + input run as a fragment: each chat turn re-enters only
+# this subtree instead of rerunning the whole page (CSS load, controls,
+# export encode) per message.
+@st.fragment
+def _chat_ui(ctx_mode: str, top_k: int, temperature: float) -> None:
+    # Render chat so far
+    for m in messages:
+        render_message(m)
+
+    # ---------- Input ----------
+    prompt = st.chat_input("Type your question…")
+
+    if prompt:
+        # Append user turn (deque drops the oldest once at capacity)
+        messages.append({"role": "user", "content": prompt})
+        with st.chat_message("user"):
+            st.markdown(prompt)
+
+        # ---- Build payload for backend ----
+        payload = {
+            "messages": list(messages),
+            "top_k": int(top_k),
+            "temperature": float(temperature),
+            "ctx_mode": "notes" if ctx_mode == "Notes only" else "notes+web",
         }
-    else:
+
+        # ---- Call backend over the shared keep-alive client ----
+        # stream=True asks /chat for SSE deltas; perceived latency becomes
+        # first-token time instead of full-completion time.
         try:
-            with st.spinner("Thinking…"):
-                resp = httpx.post(f"{FASTAPI_URL}/chat", json=payload, timeout=60.0)
+            with get_client().stream(
+                "POST", "/chat", json={**payload, "stream": True}, timeout=60.0
+            ) as resp:
                 resp.raise_for_status()
-                data = resp.json()  # { "text": "...", "citations": [ {...}, ... ] }
-                answer_msg = {
-                    "role": "assistant",
-                    "content": {"text": data.get("text", "")},
-                    "citations": data.get("citations", []),
-                }
+                if resp.headers.get("content-type", "").startswith("text/event-stream"):
+                    citations: list = []
+
+                    def _deltas():
+                        for line in resp.iter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            event = _loads(line[5:])
+                            if event.get("done"):
+                                citations.extend(event.get("citations") or [])
+                            else:
+                                yield event.get("delta", "")
+
+                    with st.chat_message("assistant"):
+                        text = st.write_stream(_deltas())
+                        if show_citations and citations:
+                            _render_citations(citations)
+                    answer_msg = {
+                        "role": "assistant",
+                        "content": {"text": text if isinstance(text, str) else ""},
+                        "citations": citations,
+                    }
+                else:
+                    # Backend answered with plain JSON; fall back to the
+                    # buffered shape. { "text": "...", "citations": [...] }
+                    resp.read()
+                    data = resp.json()
+                    answer_msg = {
+                        "role": "assistant",
+                        "content": {"text": data.get("text", "")},
+                        "citations": data.get("citations", []),
+                    }
+        except ImportError:
+            # Fallback: simple local response if the dependency is missing
+            answer_msg = {
+                "role": "assistant",
+                "content": {
+                    "text": (
+                        "The chat backend isn't available because the `httpx` "
+                        "library is not installed in this environment.\n\n"
+                        "You can still ask conceptual questions, but I can't "
+                        "retrieve your indexed notes or web results here."
+                    )
+                },
+                "citations": [],
+            }
         except Exception as e:
             # graceful fallback on error
             answer_msg = {
@@ -166,12 +220,13 @@ if prompt:
                 "citations": [],
             }
 
-    # Append assistant turn & render
-    st.session_state["messages"].append(answer_msg)
-    render_message(answer_msg)
+        # Append assistant turn, then one app-scoped rerun so widgets
+        # outside the fragment (the Export payload built above) re-stage
+        # with the new history instead of the pre-turn snapshot.
+        messages.append(answer_msg)
+        st.rerun(scope="app")
+
 
-    # Keep chat size reasonable (avoid unbounded growth)
-    if len(st.session_state["messages"]) > 60:
-        st.session_state["messages"] = st.session_state["messages"][-60:]
+_chat_ui(ctx_mode, top_k, temperature)
 
 st.markdown("</div>", unsafe_allow_html=True)
@@ -1,18 +1,25 @@
 # ui/bootstrap.py
 from __future__ import annotations
 
-import os
 from typing import Optional, Dict, Any
 
 import streamlit as st
 
-# Try to import httpx, but don't crash if it's missing
-try:
-    import httpx  # type: ignore
-except ImportError:
-    httpx = None  # type: ignore
+from ui.http import FASTAPI_URL, get_client
 
-FASTAPI_URL = (os.getenv("FASTAPI_URL", "http://127.0.0.1:8000") or "").rstrip("/")
+
+# Status poll cached with a short TTL: a burst of page interactions hits
+# the backend at most once per 30s instead of once per rerun. The Upload
+# page calls _fetch_status.clear() after a successful ingest.
+@st.cache_data(ttl=30, show_spinner=False)
+def _fetch_status() -> Optional[Dict[str, Any]]:
+    try:
+        r = get_client().get("/corpus/status", timeout=10.0)
+        r.raise_for_status()
+        return r.json()
+    except Exception:
+        # includes a missing httpx install raising inside get_client
+        return None
 
 
 def ensure_corpus() -> bool:
@@ -32,21 +39,18 @@ def ensure_corpus() -> bool:
     if st.session_state.get("has_corpus") is True:
         return True
 
-    # If httpx isn't available or FASTAPI_URL isn't set, just rely on session state
-    if httpx is None or not FASTAPI_URL:
+    # If FASTAPI_URL isn't set, just rely on session state
+    if not FASTAPI_URL:
         return bool(st.session_state.get("has_corpus"))
 
-    # Try backend
-    try:
-        r = httpx.get(f"{FASTAPI_URL}/corpus/status", timeout=10.0)
-        r.raise_for_status()
-        meta: Dict[str, Any] = r.json()
-        ready = bool(meta.get("ready"))
-        st.session_state["has_corpus"] = ready
-        st.session_state["lecture_title"] = meta.get("lecture_title")
-        st.session_state["generated_at"] = meta.get("generated_at")
-        st.session_state["sections_count"] = int(meta.get("sections") or 0)
-        return ready
-    except Exception:
+    meta = _fetch_status()
+    if meta is None:
         # leave as-is; page may still fallback to local sample if available
         return bool(st.session_state.get("has_corpus"))
+
+    ready = bool(meta.get("ready"))
+    st.session_state["has_corpus"] = ready
+    st.session_state["lecture_title"] = meta.get("lecture_title")
+    st.session_state["generated_at"] = meta.get("generated_at")
+    st.session_state["sections_count"] = int(meta.get("sections") or 0)
+    return ready
@@ -0,0 +1,35 @@
+# ui/http.py
+from __future__ import annotations
+
+import os
+
+import streamlit as st
+
+FASTAPI_URL = (os.getenv("FASTAPI_URL", "http://127.0.0.1:8000") or "").rstrip("/")
+
+
+@st.cache_resource(show_spinner=False)
+def get_client():
+    """One pooled httpx.Client per process for all backend calls.
+
+    Keep-alive connections amortize the TCP (and TLS) handshake a bare
+    httpx.post pays on every request; HTTP/2 is enabled when the optional
+    h2 package is installed. httpx itself is imported lazily — it pulls a
+    heavy dependency tree, and a missing install surfaces as ImportError
+    at the first call site, where pages already fall back gracefully.
+    """
+    import httpx
+
+    try:
+        import h2  # type: ignore  # noqa: F401
+
+        http2 = True
+    except ImportError:
+        http2 = False
+
+    return httpx.Client(
+        base_url=FASTAPI_URL,
+        http2=http2,
+        timeout=60.0,
+        limits=httpx.Limits(max_keepalive_connections=8),
+    )
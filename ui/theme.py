@@ -2,13 +2,22 @@ from pathlib import Path
 import streamlit as st
 
 _ASSETS = Path("assets/styles")
-#test comment 
-def load_css(*files: str):
-    """Inject one or more CSS files (from assets/styles) into the page."""
+#test comment
+
+# Blob cached per file tuple: reruns inject the in-process string instead
+# of re-reading each stylesheet from disk on every interaction.
+@st.cache_data(show_spinner=False)
+def _css_blob(files: tuple) -> str:
     css_blob = ""
     for f in files:
         p = _ASSETS / f
         if p.exists():
             css_blob += p.read_text(encoding="utf-8") + "\n"
+    return css_blob
+
+
+def load_css(*files: str):
+    """Inject one or more CSS files (from assets/styles) into the page."""
+    css_blob = _css_blob(files)
     if css_blob:
         st.markdown(f"<style>{css_blob}</style>", unsafe_allow_html=True)